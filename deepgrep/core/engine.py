@@ -1,42 +1,112 @@
-# engine.py
-
-from .parser import PatternParser
-from .matcher import MatchState
-
-from functools import lru_cache
-from .parser import PatternParser
-from .matcher import MatchState
-
 # core/engine.py
-from copy import deepcopy
 from functools import lru_cache
+from typing import Optional, Tuple
 from .parser import PatternParser
+from .matcher import (
+    AlternationMatcher, CaptureGroupMatcher, LiteralMatcher, MatchState,
+    PlusMatcher, Quantified, SequenceMatcher,
+)
 
 @lru_cache(maxsize=512)
 def compile_pattern(pattern: str):
-    """Parse pattern once and cache the result"""
+    """
+    Parse pattern once and cache the result.
+    Matchers hold no per-match state, so the cached tree is shared by every caller.
+    """
     parser = PatternParser(pattern)
-    return parser.parse()
+    tree = parser.parse()
+    if not parser.has_backrefs:
+        # Nothing reads the captures, so drop them: states then differ only by position
+        # and paths that reach the same position with different captures collapse into one
+        tree = PatternParser(pattern, capture_groups=False).parse()
+    return tree
 
-def find_matches(line: str, pattern: str):
-    matcher = deepcopy(compile_pattern(pattern))  # <-- deepcopy per use
-    matches = []
+def _literal_prefixes(node) -> Optional[Tuple[str, ...]]:
+    """
+    Return literal strings one of which every match of node must start with,
+    or None if a match can start with (or be) anything else.
+    """
+    if isinstance(node, LiteralMatcher):
+        return (node.char,)
+    if isinstance(node, SequenceMatcher):
+        if isinstance(node.matchers[0], LiteralMatcher):
+            # Extend through the run of leading literals: "foo(bar)?" -> "foo"
+            prefix = ""
+            for m in node.matchers:
+                if not isinstance(m, LiteralMatcher):
+                    break
+                prefix += m.char
+            return (prefix,)
+        return _literal_prefixes(node.matchers[0])
+    if isinstance(node, AlternationMatcher):
+        left = _literal_prefixes(node.left)
+        right = _literal_prefixes(node.right)
+        return None if left is None or right is None else left + right
+    if isinstance(node, (CaptureGroupMatcher, PlusMatcher)):
+        return _literal_prefixes(node.matcher)
+    if isinstance(node, Quantified):
+        # {n}, {n,} and {n,m} need at least one occurrence when n >= 1
+        low = node.kind.strip("{}").split(",")[0]
+        if node.kind.startswith("{") and low.isdigit() and int(low) >= 1:
+            return _literal_prefixes(node.node)
+    return None
+
+@lru_cache(maxsize=512)
+def compile_prefilter(pattern: str) -> Optional[Tuple[str, ...]]:
+    """Literal prefixes every match of pattern starts with, used to skip ahead with str.find."""
+    return _literal_prefixes(compile_pattern(pattern))
+
+def _scan(matcher, line: str, prefixes: Optional[Tuple[str, ...]] = None):
+    """
+    Yield the leftmost-longest matches of a compiled matcher in line.
+    With prefixes, the matcher only runs where one of them occurs; str.find does the skipping.
+    """
     i = 0
     L = len(line)
+    # Next known occurrence of each prefix. A prefix is only searched again once i has moved
+    # past its cached hit, and dropped once absent, so each one is scanned across the line once.
+    next_hit = dict.fromkeys(prefixes, -1) if prefixes is not None else None
 
     while i < L:
+        if next_hit is not None:
+            for p, pos in list(next_hit.items()):
+                if pos < i:
+                    pos = line.find(p, i)
+                    if pos < 0:
+                        del next_hit[p]
+                        continue
+                    next_hit[p] = pos
+            if not next_hit:
+                return
+            i = min(next_hit.values())
         initial_state = MatchState(pos=i, groups={})
         next_states = matcher.match(line, initial_state)
         if not next_states:
             i += 1
             continue
         longest_pos = max(state.pos for state in next_states)
-        matches.append(line[i:longest_pos])
+        yield line[i:longest_pos]
         i = max(longest_pos, i + 1)
-    return matches
+
+def find_matches(line: str, pattern: str):
+    return list(_scan(compile_pattern(pattern), line, compile_prefilter(pattern)))
+
+def iter_matches_bulk(text: str, pattern: str):
+    """
+    Lazily yield matches from every line of a multi-line text.
+    The pattern is looked up once; nothing is buffered beyond the current line.
+    """
+    matcher = compile_pattern(pattern)
+    prefixes = compile_prefilter(pattern)
+    for line in text.splitlines():
+        yield from _scan(matcher, line, prefixes)
+
+def find_matches_bulk(text: str, pattern: str):
+    """Find matches in every line of a multi-line text, looking the pattern up once."""
+    return list(iter_matches_bulk(text, pattern))
 
 def match_pattern(line: str, pattern: str):
-    matcher = deepcopy(compile_pattern(pattern))  # <-- deepcopy per use
+    matcher = compile_pattern(pattern)
     start_positions = [0] if pattern.startswith("^") else range(len(line))
     for i in start_positions:
         initial_state = MatchState(pos=i, groups={})
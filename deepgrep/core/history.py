@@ -1,8 +1,13 @@
 import sqlite3, json
+import atexit
 import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from decouple import config
 
 # Configure logging
@@ -11,17 +16,43 @@ logger = logging.getLogger(__name__)
 # Load configuration from environment variables
 DB_PATH = Path(config('DB_PATH', default='~/.grepify_history.db')).expanduser()
 MAX_HISTORY = config('MAX_HISTORY', default=200, cast=int)
+HISTORY_CACHE_TTL = config('HISTORY_CACHE_TTL', default=1.0, cast=float)
+HISTORY_WRITE_BATCH = config('HISTORY_WRITE_BATCH', default=64, cast=int)
+
+_INSERT_SQL = "INSERT INTO search_logs (pattern, timestamp, match_count, files) VALUES (?, ?, ?, ?)"
 
 class SearchHistoryDB:
     """SQLite-backed search history logger."""
 
     def __init__(self, db_path: Path = DB_PATH):
         self.db_path = db_path
+        # One connection for the lifetime of the object, shared by request threads
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # list_all() results per limit; cleared on every write, the TTL covers writers in other processes
+        self._list_cache: Dict[Optional[int], Tuple[float, List[Tuple]]] = {}
+        # Rows queued by log_search_async() that the writer thread hasn't committed yet, oldest first
+        self._pending: List[Tuple] = []
+        self._queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
         self._init_db()
 
+    @contextmanager
+    def _connect(self):
+        """Serialize access to the shared connection; commits on success, rolls back on error."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
     def _init_db(self):
         logger.info(f"Initializing search history database at {self.db_path}")
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS search_logs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -33,33 +64,108 @@ class SearchHistoryDB:
             """)
         logger.info("Database initialized successfully")
 
+    @staticmethod
+    def _prune(conn: sqlite3.Connection) -> int:
+        """
+        Keep only the newest MAX_HISTORY rows.
+        Ids are AUTOINCREMENT and only ever grow, so this is a primary-key range
+        delete rather than a NOT IN subselect over the whole table.
+        """
+        result = conn.execute(
+            "DELETE FROM search_logs WHERE id <= (SELECT MAX(id) FROM search_logs) - ?",
+            (MAX_HISTORY,),
+        )
+        return result.rowcount
+
     def log_search(self, pattern: str, match_count: int, files: List[str]):
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute(
-                "INSERT INTO search_logs (pattern, timestamp, match_count, files) VALUES (?, ?, ?, ?)",
+                _INSERT_SQL,
                 (pattern, datetime.now(timezone.utc).isoformat(), match_count, json.dumps(files)),
             )
             # Cleanup old records
-            result = conn.execute("""
-                DELETE FROM search_logs WHERE id NOT IN (
-                    SELECT id FROM search_logs ORDER BY id DESC LIMIT ?
-                );
-            """, (MAX_HISTORY,))
-            deleted_count = result.rowcount
+            deleted_count = self._prune(conn)
+            self._list_cache.clear()
             conn.commit()
         logger.info(f"Logged search: pattern='{pattern}', matches={match_count}, files={len(files)}")
         if deleted_count > 0:
             logger.debug(f"Cleaned up {deleted_count} old records")
 
+    def log_searches(self, entries: Iterable[Tuple[str, int, List[str]]]) -> int:
+        """
+        Log many (pattern, match_count, files) entries in a single transaction.
+        One executemany() and one prune instead of a commit per search.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (pattern, now, match_count, json.dumps(files))
+            for pattern, match_count, files in entries
+        ]
+        with self._connect() as conn:
+            conn.executemany(_INSERT_SQL, rows)
+            deleted_count = self._prune(conn)
+            self._list_cache.clear()
+        logger.info(f"Logged {len(rows)} searches")
+        if deleted_count > 0:
+            logger.debug(f"Cleaned up {deleted_count} old records")
+        return len(rows)
+
+    def log_search_async(self, pattern: str, match_count: int, files: List[str]):
+        """
+        Queue a search for the background writer and return immediately.
+        The entry shows up in list_all() right away, before it is committed.
+        """
+        row = (pattern, datetime.now(timezone.utc).isoformat(), match_count, json.dumps(files))
+        with self._lock:
+            self._pending.append(row)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._drain, name="history-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+            # Enqueue under the lock so queue order matches _pending order
+            self._queue.put_nowait(row)
+
+    def flush(self):
+        """Block until every queued search has been written."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def _drain(self):
+        """Writer thread: commit queued rows in batches of up to HISTORY_WRITE_BATCH."""
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < HISTORY_WRITE_BATCH:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                try:
+                    with self._conn:
+                        self._conn.executemany(_INSERT_SQL, rows)
+                        self._prune(self._conn)
+                    # Committed; dropping the batch under the same lock means list_all()
+                    # never sees a row both pending and committed
+                    self._list_cache.clear()
+                    logger.debug(f"Wrote {len(rows)} queued searches")
+                except Exception as e:
+                    # Rolled back; the batch is dropped below so later searches stay visible
+                    logger.error(f"Failed to write {len(rows)} queued searches, discarding them: {str(e)}",
+                                 exc_info=True)
+                finally:
+                    del self._pending[:len(rows)]
+            for _ in rows:
+                self._queue.task_done()
+
     def get_recent(self, limit: int = 5) -> List[Tuple]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             return conn.execute(
                 "SELECT pattern, timestamp, match_count, files FROM search_logs ORDER BY id DESC LIMIT ?",
                 (limit,),
             ).fetchall()
 
     def get_top_patterns(self, limit: int = 5) -> List[Tuple]:
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             return conn.execute("""
                 SELECT pattern, COUNT(*) as count
                 FROM search_logs
@@ -69,10 +175,22 @@ class SearchHistoryDB:
             """, (limit,)).fetchall()
 
     def list_all(self, limit: int = None) -> List[Tuple]:
-        with sqlite3.connect(self.db_path) as conn:
-            return conn.execute(
-                "SELECT pattern, timestamp, match_count, files FROM search_logs ORDER BY id DESC"
-            ).fetchall()
+        sql = "SELECT pattern, timestamp, match_count, files FROM search_logs ORDER BY id DESC"
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit,)
+        with self._connect() as conn:
+            pending = self._pending[::-1]
+            now = time.monotonic()
+            cached = self._list_cache.get(limit)
+            if cached is not None and now - cached[0] < HISTORY_CACHE_TTL:
+                rows = cached[1]
+            else:
+                rows = conn.execute(sql, params).fetchall()
+                self._list_cache[limit] = (now, rows)
+        rows = pending + rows
+        return rows if limit is None else rows[:limit]
 
     def export_to_json(self, file_path: Path) -> int:
         rows = self.list_all()
@@ -86,25 +204,21 @@ class SearchHistoryDB:
 
     def import_from_json(self, file_path: Path) -> int:
         data = json.loads(file_path.read_text(encoding="utf-8"))
-        with sqlite3.connect(self.db_path) as conn:
-            for entry in data:
-                ts = entry.get("timestamp")
-                if ts is None:
-                    ts = datetime.now(timezone.utc).isoformat()
-                conn.execute(
-                    "INSERT INTO search_logs (pattern, timestamp, match_count, files) VALUES (?, ?, ?, ?)",
-                    (
-                        entry["pattern"],
-                        ts,
-                        entry.get("match_count", 0),
-                        json.dumps(entry.get("files", [])),
-                    ),
-                )
-            conn.execute("""
-                DELETE FROM search_logs WHERE id NOT IN (
-                    SELECT id FROM search_logs ORDER BY id DESC LIMIT ?
-                );
-            """, (MAX_HISTORY,))
-            conn.commit()
+        now = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for entry in data:
+            ts = entry.get("timestamp")
+            if ts is None:
+                ts = now
+            rows.append((
+                entry["pattern"],
+                ts,
+                entry.get("match_count", 0),
+                json.dumps(entry.get("files", [])),
+            ))
+        with self._connect() as conn:
+            conn.executemany(_INSERT_SQL, rows)
+            self._prune(conn)
+            self._list_cache.clear()
         logger.info(f"Imported {len(data)} search records from {file_path}")
         return len(data)
\ No newline at end of file
@@ -1,4 +1,3 @@
-from copy import deepcopy
 from dataclasses import dataclass, field
 from typing import Dict, Set, List
 
@@ -197,7 +196,7 @@ class CaptureGroupMatcher(Matcher):
         results = self.matcher.match(line, state)
         updated = set()
         for r in results:
-            gcopy = deepcopy(r.groups)
+            gcopy = dict(r.groups)  # values are immutable strings, a shallow copy is enough
             gcopy[self.gid] = line[state.pos:r.pos]
             updated.add(MatchState(r.pos, gcopy))
         return updated
@@ -228,6 +227,13 @@ class Quantified(Matcher):
         self.node = node
         self.kind = kind
 
+    def _step(self, line: str, states: Set[MatchState]) -> Set[MatchState]:
+        """Advance every state by exactly one more occurrence of the wrapped matcher."""
+        next_states = set()
+        for s in states:
+            next_states |= self.node.match(line, s)
+        return next_states
+
     def match(self, line: str, state: MatchState) -> Set[MatchState]:
         if self.kind == "?":
             return {state} | self.node.match(line, state)
@@ -238,50 +244,38 @@ class Quantified(Matcher):
         elif self.kind.startswith("{") and self.kind.endswith("}"):
             # parse {n}, {n,}, {n,m}
             content = self.kind[1:-1]
-            results = [(state.pos, state.groups)]
             if "," in content:
                 # {n,} or {n,m}
                 parts = content.split(",")
                 n = int(parts[0])
                 m = int(parts[1]) if len(parts) > 1 and parts[1] else None
-                # Apply minimum n matches
-                for _ in range(n):
-                    next_results = []
-                    for p, g in results:
-                        ms = self.node.match(line, MatchState(p, g))
-                        for mstate in ms:
-                            next_results.append((mstate.pos, mstate.groups))
-                    results = next_results
-                    if not results:
-                        return set()
-                # Apply remaining optional matches up to m (or unlimited)
-                if m is None:
-                    all_states = set(MatchState(p, g) for p, g in results)
-                    for p, g in results:
-                        all_states |= StarMatcher(self.node).match(line, MatchState(p, g))
-                    return all_states
-                else:
-                    for _ in range(m - n):
-                        next_results = []
-                        for p, g in results:
-                            ms = self.node.match(line, MatchState(p, g))
-                            for mstate in ms:
-                                next_results.append((mstate.pos, mstate.groups))
-                        results += next_results
-                    return {MatchState(p, g) for p, g in results}
             else:
                 # {n}
-                n = int(content)
-                for _ in range(n):
-                    next_results = []
-                    for p, g in results:
-                        ms = self.node.match(line, MatchState(p, g))
-                        for mstate in ms:
-                            next_results.append((mstate.pos, mstate.groups))
-                    results = next_results
-                    if not results:
-                        return set()
-                return {MatchState(p, g) for p, g in results}
+                n = m = int(content)
+
+            # Apply minimum n matches
+            states = {state}
+            for _ in range(n):
+                states = self._step(line, states)
+                if not states:
+                    return set()
+
+            # Apply remaining optional matches up to m (or unlimited)
+            if m is None:
+                all_states = set(states)
+                for s in states:
+                    all_states |= StarMatcher(self.node).match(line, s)
+                return all_states
+            # Only the frontier of newly reached states is expanded, so the work per
+            # repetition stays bounded by the number of distinct states, not 2^(m-n)
+            all_states = set(states)
+            frontier = states
+            for _ in range(m - n):
+                frontier = self._step(line, frontier) - all_states
+                if not frontier:
+                    break
+                all_states |= frontier
+            return all_states
         else:
             return self.node.match(line, state)
 
@@ -6,15 +6,24 @@ class ParseError(Exception):
     """Custom exception for pattern parsing errors."""
     pass
 
+# str.isdigit() also accepts characters like '²' that int() rejects; counts and group ids are ASCII only
+ASCII_DIGITS = "0123456789"
+
+def _is_number(s: str) -> bool:
+    return s != "" and all(c in ASCII_DIGITS for c in s)
+
 class PatternParser:
     """
         Parses a regex string into a tree of Matcher objects.
         Supports literals, character classes, anchors, quantifiers, groups, and backreferences.
     """
-    def __init__(self, pattern: str):
+    def __init__(self, pattern: str, capture_groups: bool = True):
         self.pattern = pattern
         self.index = 0
         self.next_group_id = 1
+        # With capture_groups=False, (...) only groups and records nothing in MatchState
+        self.capture_groups = capture_groups
+        self.has_backrefs = False
 
     # --------------------------
     # Utility methods
@@ -87,10 +96,15 @@ class PatternParser:
         if nxt == "{":
             self.advance()
             content = ""
-            while (c := self.peek()) and (c.isdigit() or c == ","):
+            while (c := self.peek()) and (c in ASCII_DIGITS or c == ","):
                 content += self.advance()
             if self.advance() != "}":
                 raise ParseError(f"Expected closing '}}' for quantifier at position {self.index}")
+            low, comma, high = content.partition(",")
+            if not _is_number(low) or (high and not _is_number(high)) or "," in high:
+                raise ParseError(f"Invalid quantifier '{{{content}}}' at position {self.index}")
+            if high and int(high) < int(low):
+                raise ParseError(f"Quantifier range out of order '{{{content}}}' at position {self.index}")
             return Quantified(atom, "{" + content + "}")
 
         return atom
@@ -136,7 +150,11 @@ class PatternParser:
         self.advance()  # skip '\'
         ch = self.advance()
         if ch is None: raise ParseError("Dangling backslash at end of pattern")
-        if ch.isdigit(): return BackreferenceMatcher(int(ch))
+        if ch.isdigit() and ch not in ASCII_DIGITS:
+            raise ParseError(f"Invalid backreference '\\{ch}' at position {self.index - 1}")
+        if ch in ASCII_DIGITS:
+            self.has_backrefs = True
+            return BackreferenceMatcher(int(ch))
         if ch == "d": return DigitMatcher()
         if ch == "w": return WordMatcher()
         return LiteralMatcher(ch)
@@ -168,4 +186,6 @@ class PatternParser:
         expr = self._parse_expression()
         if self.advance() != ")":
             raise ParseError(f"Unclosed group starting at position {self.index}")
+        if not self.capture_groups:
+            return expr
         return CaptureGroupMatcher(expr, group_id)
\ No newline at end of file
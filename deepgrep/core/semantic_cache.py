@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class CacheEntry:
+    """A cached result list with the unit vector of the keyword that produced it."""
+    vector: np.ndarray
+    matches: List[Tuple[str, float]]
+    expires_at: float
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class SemanticCache:
+    """
+    Thread-safe LRU cache of semantic search results.
+
+    Entries are grouped by namespace (e.g. a digest of the searched text). A lookup hits
+    when the keyword was cached verbatim, or when its vector is within `threshold` cosine
+    similarity of a keyword cached for the same namespace.
+    """
+
+    def __init__(self, max_entries: int = 512, threshold: float = 0.95, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Hashable, str], CacheEntry]" = OrderedDict()
+        self._by_namespace: Dict[Hashable, Dict[str, CacheEntry]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, namespace: Hashable, keyword: str, vector: np.ndarray) -> Optional[List[Tuple[str, float]]]:
+        """Return a copy of the cached matches for keyword, or None on a miss."""
+        with self._lock:
+            key = (namespace, keyword)
+            if key not in self._entries:
+                key = self._nearest(namespace, _normalize(vector))
+                if key is None:
+                    return None
+            entry = self._entries[key]
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return list(entry.matches)
+
+    def put(self, namespace: Hashable, keyword: str, vector: np.ndarray,
+            matches: List[Tuple[str, float]]):
+        with self._lock:
+            key = (namespace, keyword)
+            if key in self._entries:
+                self._remove(key)
+            entry = CacheEntry(_normalize(vector), list(matches), time.monotonic() + self.ttl)
+            self._entries[key] = entry
+            self._by_namespace.setdefault(namespace, {})[keyword] = entry
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_namespace.clear()
+
+    def _nearest(self, namespace: Hashable, vector: np.ndarray) -> Optional[Tuple[Hashable, str]]:
+        """Find the cached keyword in namespace closest to vector, if it clears the threshold."""
+        candidates = self._by_namespace.get(namespace)
+        if not candidates or not vector.any():
+            return None
+        keywords = list(candidates)
+        sims = np.vstack([candidates[k].vector for k in keywords]) @ vector
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        return namespace, keywords[best]
+
+    def _remove(self, key: Tuple[Hashable, str]):
+        namespace, keyword = key
+        del self._entries[key]
+        bucket = self._by_namespace[namespace]
+        del bucket[keyword]
+        if not bucket:
+            del self._by_namespace[namespace]
@@ -1,21 +1,109 @@
+import hashlib
+import numpy as np
 import spacy
+from dataclasses import dataclass
+from functools import lru_cache
 from nltk.corpus import wordnet
 from typing import List, Tuple
-from decouple import config
+from decouple import config, Csv
+from .semantic_cache import SemanticCache
 
 # Load configuration from environment variables
 SPACY_MODEL = config('SPACY_MODEL', default='en_core_web_md')
+# Only the tagger (POS), stop words and word vectors are used; skip the rest of the pipeline
+SPACY_EXCLUDE = config('SPACY_EXCLUDE', default='parser,ner,lemmatizer', cast=Csv())
+# Longest text (in characters) the pipeline will parse; also applied as nlp.max_length
+SEMANTIC_MAX_LENGTH = config('SEMANTIC_MAX_LENGTH', default=1_000_000, cast=int)
 SEMANTIC_THRESHOLD = config('SEMANTIC_THRESHOLD', default=0.45, cast=float)
 SEMANTIC_TOP_N = config('SEMANTIC_TOP_N', default=10, cast=int)
+SEMANTIC_PARSE_CACHE_SIZE = config('SEMANTIC_PARSE_CACHE_SIZE', default=16, cast=int)
+SEMANTIC_CACHE_SIZE = config('SEMANTIC_CACHE_SIZE', default=512, cast=int)
+SEMANTIC_CACHE_THRESHOLD = config('SEMANTIC_CACHE_THRESHOLD', default=0.95, cast=float)
+SEMANTIC_CACHE_TTL = config('SEMANTIC_CACHE_TTL', default=300, cast=float)
 
 
-def get_antonyms(word: str) -> set:
+@lru_cache(maxsize=4096)
+def get_antonyms(word: str) -> frozenset:
+    """WordNet antonyms of word; cached since synset traversal is slow and keywords repeat."""
     antonyms = set()
     for syn in wordnet.synsets(word):
         for lemma in syn.lemmas():
             for ant in lemma.antonyms():
                 antonyms.add(ant.name())
-    return antonyms
+    return frozenset(antonyms)
+
+
+@lru_cache(maxsize=None)
+def load_model(model_name: str):
+    """Load a SpaCy model once per process; every SemanticEngine using it shares the pipeline."""
+    try:
+        nlp = spacy.load(model_name, exclude=SPACY_EXCLUDE)
+    except OSError:
+        raise RuntimeError(
+            f"SpaCy model '{model_name}' not found. Run: python -m spacy download {model_name}"
+        )
+    nlp.max_length = SEMANTIC_MAX_LENGTH
+    return nlp
+
+
+def unit_vectors(tokens) -> np.ndarray:
+    """Stack token vectors with every row scaled to unit length; tokens without a vector stay zero."""
+    vectors = np.vstack([t.vector for t in tokens])
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+@dataclass
+class ParsedText:
+    """
+    Tokens of a text that are worth scoring, stored per distinct word: `words`, `lower`,
+    `orths` and the normalized vectors in `units` have one row per word, and `word_index`
+    maps every occurrence (in text order, alongside its POS tag) to its row.
+    Only plain strings and arrays are kept, so the SpaCy Doc can be freed after parsing.
+    """
+    pos: np.ndarray
+    word_index: np.ndarray
+    words: List[str]
+    lower: np.ndarray
+    orths: np.ndarray
+    units: np.ndarray
+
+    def __len__(self) -> int:
+        return self.word_index.size
+
+    @classmethod
+    def from_tokens(cls, tokens: list) -> "ParsedText":
+        rows = {}
+        first = []  # one token per distinct orth, to read its text and vector
+        word_index = np.empty(len(tokens), dtype=np.intp)
+        for i, token in enumerate(tokens):
+            row = rows.get(token.orth)
+            if row is None:
+                row = rows[token.orth] = len(first)
+                first.append(token)
+            word_index[i] = row
+        return cls(
+            pos=np.array([token.pos_ for token in tokens], dtype=str),
+            word_index=word_index,
+            words=[token.text for token in first],
+            lower=np.array([token.text.lower() for token in first], dtype=str),
+            orths=np.array([token.orth for token in first], dtype=np.uint64),
+            units=unit_vectors(first) if first else np.zeros((0, 0), dtype=np.float32),
+        )
+
+
+def similarity_matrix(key_tokens, parsed: ParsedText) -> np.ndarray:
+    """
+    Cosine similarity of every key token against every parsed token, computed with one matmul.
+    Mirrors Token.similarity(): identical tokens score 1.0, tokens without a vector score 0.0.
+    """
+    if not key_tokens or not len(parsed):
+        return np.zeros((len(key_tokens), len(parsed)), dtype=np.float32)
+    sims = unit_vectors(key_tokens) @ parsed.units.T
+    key_orths = np.array([t.orth for t in key_tokens], dtype=np.uint64)
+    sims[key_orths[:, None] == parsed.orths[None, :]] = 1.0
+    # Score each distinct word once, then spread the scores over its occurrences
+    return sims[:, parsed.word_index]
 
 
 class SemanticEngine:
@@ -24,34 +112,80 @@ class SemanticEngine:
     def __init__(self, model_name: str = None):
         if model_name is None:
             model_name = SPACY_MODEL
-        try:
-            self.nlp = spacy.load(model_name)
-        except OSError:
-            raise RuntimeError(
-                f"SpaCy model '{model_name}' not found. Run: python -m spacy download {model_name}"
-            )
-
-    def find_semantic_matches(self, text: str, keyword: str, top_n: int = None) -> List[Tuple[str, float]]:
+        self.nlp = load_model(model_name)
+        # Repeated keywords against the same text reuse the parse instead of re-running the pipeline
+        self._candidates = lru_cache(maxsize=SEMANTIC_PARSE_CACHE_SIZE)(self._parse_candidates)
+        # Keywords repeat across requests; keep their parsed token (and vector) around
+        self._key_token = lru_cache(maxsize=1024)(self._parse_keyword)
+        # Results for the same text and a near-identical keyword are served without re-scoring
+        self._results = SemanticCache(SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL)
+
+    def _parse_candidates(self, text: str) -> ParsedText:
+        """Parse text and keep only the tokens worth scoring (alphabetic, non-stop words)."""
+        doc = self.nlp(text)
+        tokens = [token for token in doc if token.is_alpha and not token.is_stop]
+        return ParsedText.from_tokens(tokens)
+
+    def _parse_keyword(self, keyword: str):
+        return self.nlp(keyword)[0]
+
+    def find_semantic_matches(self, text: str, keyword: str, top_n: int = None,
+                              use_cache: bool = True, decimals: int = None) -> List[Tuple[str, float]]:
+        """Rank words in text by similarity to keyword; scores are rounded to `decimals` if given."""
         if top_n is None:
             top_n = SEMANTIC_TOP_N
-        doc = self.nlp(text)
-        key_token = self.nlp(keyword)[0]
+        key_token = self._key_token(keyword)
+        if use_cache:
+            namespace = (hashlib.blake2b(text.encode(), digest_size=16).digest(), top_n, decimals)
+            cached = self._results.get(namespace, keyword, key_token.vector)
+            if cached is not None:
+                return cached
+
+        parsed = self._candidates(text)
+        sims = similarity_matrix([key_token], parsed)[0]
+        results = self._rank_candidates(parsed, sims, key_token, keyword, top_n, decimals)
+        if use_cache:
+            self._results.put(namespace, keyword, key_token.vector, results)
+        return results
+
+    def find_semantic_matches_batch(self, text: str, keywords: List[str],
+                                    top_n: int = None) -> List[List[Tuple[str, float]]]:
+        """
+        Run several keywords against the same text.
+        The text is parsed once and all keywords go through a single nlp.pipe() call.
+        """
+        parsed = self._candidates(text)
+        key_tokens = [key_doc[0] for key_doc in self.nlp.pipe(keywords)]
+        # Score every keyword against every candidate in a single matrix product
+        sims = similarity_matrix(key_tokens, parsed)
+        return [
+            self._rank_candidates(parsed, row, key_token, keyword, top_n)
+            for keyword, key_token, row in zip(keywords, key_tokens, sims)
+        ]
+
+    def _rank_candidates(self, parsed: ParsedText, sims: np.ndarray, key_token, keyword: str,
+                         top_n: int = None, decimals: int = None) -> List[Tuple[str, float]]:
+        if top_n is None:
+            top_n = SEMANTIC_TOP_N
+        keep = np.ones(len(parsed), dtype=bool)
+        # Only match similar POS (adjectives/verbs)
+        if key_token.pos_ in {"ADJ", "VERB"}:
+            keep &= parsed.pos == key_token.pos_
         antonyms = get_antonyms(keyword.lower())
-        results = []
-
-        for token in doc:
-            if not token.is_alpha or token.is_stop:
-                continue
-            # Only match similar POS (adjectives/verbs)
-            if token.pos_ != key_token.pos_ and key_token.pos_ in {"ADJ", "VERB"}:
-                continue
-            if token.text.lower() in antonyms:
-                continue  # skip antonyms
-            sim = key_token.similarity(token)
-            results.append((token.text, sim))
-
-        # Sort descending and keep top N
-        results = sorted(results, key=lambda x: x[1], reverse=True)[:top_n]
-        # Filter out weak matches
-        results = [(w, s) for w, s in results if s > SEMANTIC_THRESHOLD]
-        return results
\ No newline at end of file
+        if antonyms:
+            keep &= ~np.isin(parsed.lower, list(antonyms))[parsed.word_index]  # skip antonyms
+
+        # Filter out weak matches before ranking so only survivors get sorted
+        keep &= sims > SEMANTIC_THRESHOLD
+
+        idx = np.flatnonzero(keep)
+        if 0 < top_n < idx.size:
+            # Select the top N in linear time, then sort just those
+            idx = np.sort(idx[np.argpartition(-sims[idx], top_n - 1)[:top_n]])
+        # Sort descending (stable, so ties keep text order) and keep top N
+        idx = idx[np.argsort(-sims[idx], kind="stable")][:top_n]
+        scores = sims[idx].astype(np.float64)
+        if decimals is not None:
+            scores = np.round(scores, decimals)
+        words = parsed.words
+        return [(words[row], score) for row, score in zip(parsed.word_index[idx].tolist(), scores.tolist())]
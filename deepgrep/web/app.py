@@ -1,13 +1,23 @@
 # app.py - Production-ready Flask application with logging and rate limiting
+import gzip
+import hashlib
 import logging
-from flask import Flask, request, jsonify, render_template
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from decouple import config
-from deepgrep.core.engine import find_matches
+from decouple import config, strtobool
+from deepgrep.core.engine import compile_pattern, find_matches_bulk, iter_matches_bulk
+from deepgrep.core.parser import ParseError
 from deepgrep.core.history import SearchHistoryDB
-from deepgrep.core.semantic_engine import SemanticEngine
+from deepgrep.core.semantic_engine import SEMANTIC_MAX_LENGTH, SemanticEngine
 
 # Configure logging
 logging.basicConfig(
@@ -22,8 +32,37 @@ DEBUG = config('DEBUG', default=True, cast=bool)
 HOST = config('HOST', default='0.0.0.0')
 RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
 RATE_LIMIT_REQUESTS = config('RATE_LIMIT_REQUESTS', default=100, cast=int)
+MAX_CONTENT_LENGTH = config('MAX_CONTENT_LENGTH', default=5 * 1024 * 1024, cast=int)
+GZIP_MIN_SIZE = config('GZIP_MIN_SIZE', default=1024, cast=int)
+SEMANTIC_WORKERS = config('SEMANTIC_WORKERS', default=os.cpu_count() or 1, cast=int)
+REGEX_CACHE_SIZE = config('REGEX_CACHE_SIZE', default=1024, cast=int)
+REGEX_CACHE_MAX_BYTES = config('REGEX_CACHE_MAX_BYTES', default=64 * 1024 * 1024, cast=int)
+PRELOAD_MODELS = config('PRELOAD_MODELS', default=False, cast=bool)
+PRELOAD_TIMEOUT = config('PRELOAD_TIMEOUT', default=60.0, cast=float)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, which encodes large match lists several times faster."""
+    options = orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.options | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype
+        )
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
+app.json = OrjsonProvider(app)
+# Reject oversized bodies before they are parsed, matched or embedded
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 CORS(app)
 
 # Initialize rate limiter
@@ -37,15 +76,104 @@ limiter = Limiter(
 # Initialize engines (lazy initialization to support testing)
 semantic_engine = None
 history_db = None
+# Separate locks so a slow model load never blocks the regex endpoint's history setup
+_history_lock = threading.Lock()
+_semantic_lock = threading.Lock()
+# (pattern, text digest) -> (matches, size); clients often resend the exact same search on re-render
+_regex_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_regex_cache_bytes = 0
+_regex_cache_lock = threading.Lock()
+# Set once background preloading has finished (successfully or not)
+_ready = threading.Event()
+# Semantic scoring is CPU-heavy; cap how many requests run it at once so threads don't oversubscribe cores
+_semantic_pool = ThreadPoolExecutor(max_workers=SEMANTIC_WORKERS, thread_name_prefix="semantic")
 
-def init_engines():
-    """Initialize semantic engine and history database (called lazily on first use)."""
-    global semantic_engine, history_db
+def get_history_db() -> SearchHistoryDB:
+    """Return the shared history database, creating it on first use."""
+    global history_db
+    if history_db is None:
+        with _history_lock:
+            if history_db is None:
+                history_db = SearchHistoryDB()
+    return history_db
+
+def get_semantic_engine() -> SemanticEngine:
+    """Return the shared semantic engine, loading the SpaCy model only once per process."""
+    global semantic_engine
     if semantic_engine is None:
-        logger.info("Initializing semantic engine and history database...")
-        semantic_engine = SemanticEngine()
-        history_db = SearchHistoryDB()
-        logger.info("Application initialization complete")
+        with _semantic_lock:
+            if semantic_engine is None:
+                logger.info("Initializing semantic engine...")
+                semantic_engine = SemanticEngine()
+    return semantic_engine
+
+def init_engines():
+    """Initialize history database and semantic engine eagerly; the cheap database goes first."""
+    logger.info("Initializing history database and semantic engine...")
+    get_history_db()
+    get_semantic_engine()
+    logger.info("Application initialization complete")
+
+def _preload():
+    """Load engines off the request path so the first /semantic call doesn't pay for the model load."""
+    try:
+        init_engines()
+    except Exception as e:
+        logger.error(f"Background engine preload failed: {str(e)}", exc_info=True)
+    finally:
+        _ready.set()
+
+if PRELOAD_MODELS:
+    threading.Thread(target=_preload, name="engine-preload", daemon=True).start()
+
+def cached_regex_matches(text: str, pattern: str) -> list:
+    """Return find_matches_bulk(text, pattern), serving repeated identical searches from an LRU."""
+    global _regex_cache_bytes
+    key = (pattern, hashlib.blake2b(text.encode(), digest_size=16).digest())
+    with _regex_cache_lock:
+        cached = _regex_cache.get(key)
+        if cached is not None:
+            _regex_cache.move_to_end(key)
+            return cached[0]
+
+    matches = find_matches_bulk(text, pattern)
+    # Charge the real footprint: every str carries ~50 bytes of header, plus the list's own slots
+    size = sys.getsizeof(matches) + sum(map(sys.getsizeof, matches))
+    if REGEX_CACHE_SIZE <= 0 or size > REGEX_CACHE_MAX_BYTES:
+        return matches
+    with _regex_cache_lock:
+        if key not in _regex_cache:
+            _regex_cache[key] = (matches, size)
+            _regex_cache_bytes += size
+            while len(_regex_cache) > REGEX_CACHE_SIZE or _regex_cache_bytes > REGEX_CACHE_MAX_BYTES:
+                _, (_, evicted) = _regex_cache.popitem(last=False)
+                _regex_cache_bytes -= evicted
+    return matches
+
+@app.after_request
+def compress_response(response):
+    """Gzip large responses (long match lists compress well) for clients that accept it."""
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code >= 300
+        or "Content-Encoding" in response.headers
+        or request.accept_encodings["gzip"] <= 0  # honours q=0 and "*"
+    ):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+@app.errorhandler(413)
+def request_too_large(e):
+    logger.warning(f"{request.method} {request.path} - Request body exceeds {app.config['MAX_CONTENT_LENGTH']} bytes")
+    return jsonify({"error": "Request body too large"}), 413
 
 @app.route("/")
 def home():
@@ -55,9 +183,6 @@ def home():
 @app.route("/search", methods=["POST"])
 @limiter.limit(f"{RATE_LIMIT_REQUESTS}/minute")
 def search_regex():
-    # Only initialize history_db, not semantic_engine (not needed for regex)
-    if history_db is None:
-        init_engines()
     logger.info("POST /search - Regex search request received")
     data = request.get_json()
     pattern = data.get("pattern")
@@ -67,15 +192,50 @@ def search_regex():
         logger.warning("POST /search - Missing pattern or text in request")
         return jsonify({"error": "Missing pattern or text"}), 400
 
-    matches = []
-    # Process lines in chunks or use map to speed up for long input; keep simple here
-    for line in text.splitlines():
-        matches.extend(find_matches(line, pattern))
+    return _regex_search(pattern, text)
 
-    history_db.log_search(pattern, len(matches), ["web_input"])
-    all_history = history_db.list_all(limit=50)
+@app.route("/search/raw", methods=["POST"])
+@limiter.limit(f"{RATE_LIMIT_REQUESTS}/minute")
+def search_regex_raw():
+    """
+    Same as /search, but the body is the raw UTF-8 text and the pattern comes in the
+    X-Pattern header, so multi-megabyte inputs skip JSON decoding entirely.
+    """
+    logger.info("POST /search/raw - Regex search request received")
+    pattern = request.headers.get("X-Pattern")
+    try:
+        text = request.get_data(cache=False).decode("utf-8")
+    except UnicodeDecodeError:
+        logger.warning("POST /search/raw - Request body is not valid UTF-8")
+        return jsonify({"error": "Request body must be UTF-8 text"}), 400
+
+    if not pattern or not text:
+        logger.warning("POST /search/raw - Missing X-Pattern header or body")
+        return jsonify({"error": "Missing pattern or text"}), 400
+
+    return _regex_search(pattern, text)
+
+def _regex_search(pattern: str, text: str):
+    """Run a validated regex search and build the /search response (JSON or NDJSON)."""
+    # Compile once up front; every line below reuses the cached matcher tree
+    try:
+        compile_pattern(pattern)
+    except ParseError as e:
+        logger.warning(f"POST {request.path} - Invalid pattern '{pattern}': {e}")
+        return jsonify({"error": f"Invalid pattern: {e}"}), 400
+
+    # Only the history database is needed for regex, the SpaCy model stays unloaded
+    db = get_history_db()
+
+    if "application/x-ndjson" in request.headers.get("Accept", ""):
+        return Response(stream_with_context(_stream_regex(db, text, pattern)),
+                        mimetype="application/x-ndjson")
+
+    matches = cached_regex_matches(text, pattern)
+    db.log_search_async(pattern, len(matches), ["web_input"])
+    all_history = db.list_all(limit=50)
     
-    logger.info(f"POST /search - Successfully found {len(matches)} matches for pattern '{pattern}'")
+    logger.info(f"POST {request.path} - Successfully found {len(matches)} matches for pattern '{pattern}'")
 
     return jsonify({
         "matches": matches,
@@ -84,6 +244,26 @@ def search_regex():
         ]
     })
 
+def _stream_regex(db: SearchHistoryDB, text: str, pattern: str):
+    """
+    Yield one {"match": ...} line per match as soon as it is found, then a closing
+    {"count": ..., "history": [...]} line once the search has been queued for logging.
+    """
+    count = 0
+    for match in iter_matches_bulk(text, pattern):
+        count += 1
+        yield app.json.dumps({"match": match}) + "\n"
+
+    db.log_search_async(pattern, count, ["web_input"])
+    all_history = db.list_all(limit=50)
+    logger.info(f"POST {request.path} - Streamed {count} matches for pattern '{pattern}'")
+    yield app.json.dumps({
+        "count": count,
+        "history": [
+            {"pattern": r[0], "matches": r[2], "timestamp": r[1]} for r in all_history
+        ]
+    }) + "\n"
+
 @app.route("/semantic", methods=["POST"])
 @limiter.limit(f"{RATE_LIMIT_REQUESTS}/minute")
 def search_semantic():
@@ -96,19 +276,36 @@ def search_semantic():
     if not keyword or not text:
         logger.warning("POST /semantic - Missing keyword or text in request")
         return jsonify({"error": "Missing keyword or text"}), 400
+
+    # MAX_CONTENT_LENGTH caps the body, but SpaCy refuses texts over nlp.max_length characters
+    if len(text) > SEMANTIC_MAX_LENGTH:
+        logger.warning(f"POST /semantic - Text of {len(text)} characters exceeds {SEMANTIC_MAX_LENGTH}")
+        return jsonify({"error": f"Text too long for semantic search (max {SEMANTIC_MAX_LENGTH} characters)"}), 413
     
-    # Only initialize engines after validation passes
-    if semantic_engine is None or history_db is None:
-        init_engines()
+    # X-DeepGrep-No-Cache: true/1/yes/on skips the approximate result cache; false/0/no/off keeps it
+    try:
+        use_cache = not strtobool(request.headers.get("X-DeepGrep-No-Cache", "false"))
+    except ValueError:
+        logger.warning("POST /semantic - Invalid X-DeepGrep-No-Cache header")
+        return jsonify({"error": "X-DeepGrep-No-Cache must be a boolean"}), 400
+
+    # Only initialize engines after validation passes; both are shared across requests.
+    # If a background preload is in flight, wait for it rather than loading the model twice.
+    if PRELOAD_MODELS and semantic_engine is None:
+        _ready.wait(timeout=PRELOAD_TIMEOUT)
+    engine = get_semantic_engine()
+    db = get_history_db()
 
-    matches = semantic_engine.find_semantic_matches(text, keyword)
-    history_db.log_search(keyword, len(matches), ["web_input"])
-    all_history = history_db.list_all(limit=50)
+    matches = _semantic_pool.submit(
+        engine.find_semantic_matches, text, keyword, use_cache=use_cache, decimals=3
+    ).result()
+    db.log_search_async(keyword, len(matches), ["web_input"])
+    all_history = db.list_all(limit=50)
     
     logger.info(f"POST /semantic - Successfully found {len(matches)} semantic matches for keyword '{keyword}'")
 
     return jsonify({
-        "matches": [{"word": w, "similarity": round(s, 3)} for w, s in matches],
+        "matches": [{"word": w, "similarity": s} for w, s in matches],
         "history": [
             {"pattern": r[0], "matches": r[2], "timestamp": r[1]} for r in all_history
         ]
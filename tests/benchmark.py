@@ -4,7 +4,9 @@ import string
 import time
 import tracemalloc
 
-from deepgrep.core.engine import find_matches
+import numpy as np
+
+from deepgrep.core.engine import find_matches_bulk
 from deepgrep.core.history import SearchHistoryDB
 from deepgrep.core.semantic_engine import SemanticEngine
 
@@ -12,11 +14,13 @@ from deepgrep.core.semantic_engine import SemanticEngine
 # ----------------------
 # Helper functions
 # ----------------------
-def random_line(length=1000):
-    return ''.join(random.choices(string.ascii_letters + " ", k=length))
+ALPHABET = np.frombuffer((string.ascii_letters + " ").encode(), dtype=np.uint8)
 
 def generate_lines(n=10000, length=1000):
-    return [random_line(length) for _ in range(n)]
+    """Draw all n*length characters in one numpy call instead of a Python-level choice per character."""
+    idx = np.random.randint(0, ALPHABET.size, size=n * length)
+    buf = ALPHABET[idx].tobytes()
+    return [buf[i * length:(i + 1) * length].decode("ascii") for i in range(n)]
 
 def complex_pattern():
     # pattern with capture groups, alternations, quantifiers
@@ -31,7 +35,7 @@ pattern = complex_pattern()
 print("=== Engine/Matcher Benchmark ===")
 tracemalloc.start()
 start = time.time()
-match_count = sum(len(find_matches(line, pattern)) for line in lines)
+match_count = len(find_matches_bulk("\n".join(lines), pattern))
 end = time.time()
 mem_current, mem_peak = tracemalloc.get_traced_memory()
 tracemalloc.stop()
@@ -65,7 +69,6 @@ large_text = " ".join(generate_lines(500, 50))  # 25k words ~ manageable
 keywords = ["test", "random", "engine", "performance"]
 
 start = time.time()
-for kw in keywords:
-    matches = semantic.find_semantic_matches(large_text, kw)
+matches = semantic.find_semantic_matches_batch(large_text, keywords)
 end = time.time()
 print(f"Semantic matches for {len(keywords)} keywords done in {end - start:.2f}s")
\ No newline at end of file
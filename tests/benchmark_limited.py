@@ -1,52 +1,134 @@
 
+import os
 import time
 import tracemalloc
 import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import string
-import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
 
 # Mock spacy if needed, or just don't import semantic engine
-from deepgrep.core.engine import find_matches
+from deepgrep.core.engine import compile_pattern, find_matches
 from deepgrep.core.history import SearchHistoryDB
 
-def random_line(length=1000):
-    return ''.join(random.choices(string.ascii_letters + " ", k=length))
+ALPHABET = np.frombuffer((string.ascii_letters + " ").encode(), dtype=np.uint8)
 
 def generate_lines(n=10000, length=1000):
-    return [random_line(length) for _ in range(n)]
+    """Draw all n*length characters in one numpy call instead of a Python-level choice per character."""
+    idx = np.random.randint(0, ALPHABET.size, size=n * length)
+    buf = ALPHABET[idx].tobytes()
+    return [buf[i * length:(i + 1) * length].decode("ascii") for i in range(n)]
 
 def complex_pattern():
+    """Worst case: a backreference plus a greedy `a.*b+` that has to try every split."""
     return r"(\w+)\s+\1|foo(bar)?|a.*b+"
 
-def run_benchmark():
-    lines = generate_lines(100, 500)
-    pattern = complex_pattern()
+def linear_pattern():
+    """Same shape without the backreference, and `a[^b]*b+` so there is only one way to match."""
+    return r"foo(bar)?|a[^b]*b+"
+
+def match_lines(lines, pattern, budget=None):
+    """
+    Run find_matches over lines; returns (match_count, lines_scanned), stopping once budget
+    seconds pass. find_matches reuses the cached matcher and literal prefilter on every line.
+    """
+    start = time.perf_counter()
+    match_count = 0
+    scanned = 0
+    for line in lines:
+        match_count += len(find_matches(line, pattern))
+        scanned += 1
+        if budget is not None and time.perf_counter() - start > budget:
+            break
+    return match_count, scanned
+
+def bench_engine(label, lines, pattern, budget=None):
+    """
+    Time the engine over lines. With a budget (seconds) the run stops early once it is
+    spent, so a pathological pattern can't hang the benchmark.
+    """
+    print(f"=== Engine/Matcher Benchmark: {label} ===")
+    print(f"Pattern: {pattern}")
+    # Compile once up front so the timed loop measures matching only; find_matches reuses the cached tree
+    compile_pattern.cache_clear()
+    start = time.perf_counter()
+    compile_pattern(pattern)
+    compile_time = time.perf_counter() - start
+    print(f"Compile (cold): {compile_time * 1000:.3f}ms")
 
-    print("=== Engine/Matcher Benchmark ===")
+    start = time.perf_counter()
+    match_count, scanned = match_lines(lines, pattern, budget)
+    end = time.perf_counter()
+    # Measure memory on a separate pass: tracemalloc hooks every allocation and would inflate the timing.
+    # It gets the same budget, so a pathological pattern still cannot hang the run under the tracer
     tracemalloc.start()
-    start = time.time()
-    match_count = sum(len(find_matches(line, pattern)) for line in lines)
-    end = time.time()
+    match_lines(lines[:scanned], pattern, budget)
     mem_current, mem_peak = tracemalloc.get_traced_memory()
     tracemalloc.stop()
+    if scanned < len(lines):
+        print(f"Stopped after {scanned}/{len(lines)} lines ({budget}s budget)")
     print(f"Matches found: {match_count}")
     print(f"Time: {end - start:.2f}s")
     print(f"Peak Mem: {mem_peak/1e6:.2f}MB")
-    print(f"Throughput: {1000 / (end - start):.2f} lines/sec")
+    print(f"Throughput (amortized): {scanned / (end - start):.2f} lines/sec")
+
+def count_matches(line, pattern):
+    # Module-level so worker processes can unpickle it; compile_pattern caches the tree per process
+    return len(find_matches(line, pattern))
+
+def bench_parallel(label, lines, pattern, workers=None):
+    """Spread the lines across a process pool; the engine is pure Python, so threads would just share the GIL."""
+    workers = workers or os.cpu_count() or 1
+    print(f"=== Engine/Matcher Benchmark: {label}, {workers} processes ===")
+    chunksize = max(1, len(lines) // (workers * 4))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        match_count = sum(ex.map(partial(count_matches, pattern=pattern), lines, chunksize=chunksize))
+    end = time.perf_counter()
+    print(f"Matches found: {match_count}")
+    print(f"Time (including pool startup): {end - start:.2f}s")
+    print(f"Throughput: {len(lines) / (end - start):.2f} lines/sec")
+
+def bench_linear(lines):
+    bench_engine("linear", lines, linear_pattern())
+
+def bench_pathological(lines, budget=30.0):
+    bench_engine("worst case", lines, complex_pattern(), budget=budget)
+
+def run_benchmark():
+    lines = generate_lines(100, 500)
+    pattern = complex_pattern()
+
+    # Reported separately so backtracking noise in the worst case can't mask regressions on the linear path
+    bench_linear(lines)
+    print()
+    bench_parallel("linear", lines, linear_pattern())
+    print()
+    bench_pathological(lines)
 
     print("\n=== History DB Benchmark ===")
-    # Use in-memory DB or temp file to avoid messing with real DB if configured
-    # SearchHistoryDB uses config for path, so might need to patch or just use it (it uses ~/.grepify_history.db by default or env)
-    # Let's set env var to use a temp db
-    os.environ["DB_PATH"] = ":memory:" 
-    
-    db = SearchHistoryDB()
-    start = time.time()
-    for i in range(1000):
-        db.log_search(pattern, random.randint(0, 10), ["file1", "file2"])
-    end = time.time()
-    print(f"Logged 1000 searches in {end - start:.2f}s")
-    print(f"Write Throughput: {1000 / (end - start):.2f} ops/sec")
+    # DB_PATH is read at import time, so setting the env var here would be too late;
+    # pass a temp path explicitly instead so the real history file is never touched
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SearchHistoryDB(Path(tmp) / "history.db")
+        start = time.perf_counter()
+        for i in range(1000):
+            db.log_search(pattern, random.randint(0, 10), ["file1", "file2"])
+        end = time.perf_counter()
+        print(f"Logged 1000 searches in {end - start:.2f}s (one transaction each)")
+        print(f"Write Throughput: {1000 / (end - start):.2f} ops/sec")
+
+        entries = [(pattern, random.randint(0, 10), ["file1", "file2"]) for _ in range(1000)]
+        start = time.perf_counter()
+        db.log_searches(entries)
+        end = time.perf_counter()
+        print(f"Logged 1000 searches in {end - start:.2f}s (single transaction)")
+        print(f"Write Throughput (batched): {1000 / (end - start):.2f} ops/sec")
+        db.close()
 
 if __name__ == "__main__":
     run_benchmark()
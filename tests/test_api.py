@@ -2,30 +2,39 @@
 Comprehensive API tests for DeepGrep web application.
 Tests cover regex search, semantic search, and home route endpoints.
 """
+import gzip
 import pytest
 import json
+import threading
+import time
 from deepgrep.web.app import app
 from unittest.mock import patch
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client():
-    """Create a test client for the Flask app."""
-    from unittest.mock import MagicMock
-    import deepgrep.web.app as app_module
-    
+    """Create a test client for the Flask app, shared by every test in this module."""
     app.config['TESTING'] = True
     # Disable rate limiting for tests
     app.config['RATELIMIT_ENABLED'] = False
     
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def history_db():
+    """Give each test a fresh history mock and rate-limit window, since the client is shared."""
+    from unittest.mock import MagicMock
+    import deepgrep.web.app as app_module
+    
     # Mock history_db to avoid database operations during tests
     mock_history_db = MagicMock()
-    mock_history_db.log_search.return_value = None
+    mock_history_db.log_search_async.return_value = None
     mock_history_db.list_all.return_value = []
     app_module.history_db = mock_history_db
-    
-    with app.test_client() as client:
-        yield client
+    app_module.limiter.reset()
+    yield mock_history_db
 
 
 class TestHomeRoute:
@@ -113,6 +122,40 @@ class TestRegexSearchEndpoint:
         
         assert response.status_code == 400
     
+    @pytest.mark.parametrize("pattern", ["(abc", "a{,3}", "a{1,²}", "a{²}", "\\²"])
+    def test_regex_search_invalid_pattern(self, client, pattern):
+        """Test that a pattern that fails to parse returns 400 error."""
+        data = {
+            "pattern": pattern,
+            "text": "abc"
+        }
+        response = client.post('/search',
+                              data=json.dumps(data),
+                              content_type='application/json')
+        
+        assert response.status_code == 400
+        json_data = response.get_json()
+        assert 'error' in json_data
+    
+    def test_regex_search_body_too_large(self, client):
+        """Test that a body over MAX_CONTENT_LENGTH returns 413 error."""
+        data = {
+            "pattern": r"\d+",
+            "text": "1" * 2048
+        }
+        original_limit = app.config['MAX_CONTENT_LENGTH']
+        app.config['MAX_CONTENT_LENGTH'] = 1024
+        try:
+            response = client.post('/search',
+                                  data=json.dumps(data),
+                                  content_type='application/json')
+        finally:
+            app.config['MAX_CONTENT_LENGTH'] = original_limit
+        
+        assert response.status_code == 413
+        json_data = response.get_json()
+        assert 'error' in json_data
+    
     def test_regex_search_complex_email_pattern(self, client):
         """Test complex regex pattern for email matching."""
         data = {
@@ -143,6 +186,120 @@ class TestRegexSearchEndpoint:
         assert 'matches' in json_data
         assert len(json_data['matches']) == 2
     
+    def test_regex_search_large_response_gzipped(self, client):
+        """Test that large responses are gzip-encoded when the client accepts it."""
+        data = {
+            "pattern": r"\w+",
+            "text": "word " * 500
+        }
+        response = client.post('/search',
+                              data=json.dumps(data),
+                              content_type='application/json',
+                              headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        json_data = json.loads(gzip.decompress(response.data))
+        assert len(json_data['matches']) == 500
+    
+    def test_regex_search_gzip_refused_with_q0(self, client):
+        """Test that a client refusing gzip with q=0 gets an uncompressed response."""
+        data = {
+            "pattern": r"\w+",
+            "text": "word " * 500
+        }
+        response = client.post('/search',
+                              data=json.dumps(data),
+                              content_type='application/json',
+                              headers={'Accept-Encoding': 'identity, gzip;q=0'})
+        
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert len(response.get_json()['matches']) == 500
+    
+    def test_regex_search_streams_ndjson(self, client):
+        """Test that asking for NDJSON streams one line per match plus a closing history line."""
+        data = {
+            "pattern": r"\d+",
+            "text": "a 1 b 22\nc 333"
+        }
+        response = client.post('/search',
+                              data=json.dumps(data),
+                              content_type='application/json',
+                              headers={'Accept': 'application/x-ndjson'})
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert [line['match'] for line in lines[:-1]] == ['1', '22', '333']
+        assert lines[-1]['count'] == 3
+        assert 'history' in lines[-1]
+    
+    def test_regex_search_repeated_request_is_cached(self, client):
+        """Test that an identical repeat search is served without rescanning, but still logged."""
+        import deepgrep.web.app as app_module
+        data = {
+            "pattern": r"\d+",
+            "text": "cache me 12 and 345"
+        }
+        app_module._regex_cache.clear()
+        with patch('deepgrep.web.app.find_matches_bulk', wraps=app_module.find_matches_bulk) as scan:
+            first = client.post('/search', data=json.dumps(data), content_type='application/json')
+            second = client.post('/search', data=json.dumps(data), content_type='application/json')
+        
+        assert first.get_json()['matches'] == second.get_json()['matches'] == ['12', '345']
+        assert scan.call_count == 1
+        assert app_module.history_db.log_search_async.call_count == 2
+    
+    def test_regex_search_not_blocked_by_semantic_preload(self, client, history_db, monkeypatch):
+        """Test that /search answers while the SpaCy model is still loading in the background."""
+        from unittest.mock import MagicMock
+        import deepgrep.web.app as app_module
+        loading = threading.Event()
+        release = threading.Event()
+        
+        def slow_engine():
+            loading.set()
+            release.wait(5)
+            return MagicMock()
+        
+        monkeypatch.setattr(app_module, 'history_db', None)
+        monkeypatch.setattr(app_module, 'semantic_engine', None)
+        monkeypatch.setattr(app_module, 'SearchHistoryDB', lambda: history_db)
+        monkeypatch.setattr(app_module, 'SemanticEngine', slow_engine)
+        preload = threading.Thread(target=app_module._preload)
+        preload.start()
+        try:
+            assert loading.wait(5)
+            start = time.perf_counter()
+            response = client.post('/search',
+                                  data=json.dumps({"pattern": r"\d+", "text": "abc 123"}),
+                                  content_type='application/json')
+            elapsed = time.perf_counter() - start
+            assert response.status_code == 200
+            assert elapsed < 1
+            assert preload.is_alive()
+        finally:
+            release.set()
+            preload.join()
+    
+    def test_regex_search_raw_body(self, client):
+        """Test that /search/raw takes the text as the raw body and the pattern from X-Pattern."""
+        response = client.post('/search/raw',
+                              data="a 1 b 22\nc 333".encode(),
+                              content_type='text/plain; charset=utf-8',
+                              headers={'X-Pattern': r'\d+'})
+        
+        assert response.status_code == 200
+        assert response.get_json()['matches'] == ['1', '22', '333']
+    
+    def test_regex_search_raw_missing_pattern(self, client):
+        """Test that /search/raw without an X-Pattern header returns 400 error."""
+        response = client.post('/search/raw', data=b"some text", content_type='text/plain')
+        
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+    
     def test_regex_search_response_structure(self, client):
         """Test that response has correct structure with matches and history arrays."""
         data = {
@@ -164,6 +321,49 @@ class TestRegexSearchEndpoint:
 class TestSemanticSearchEndpoint:
     """Tests for the /semantic endpoint."""
     
+    @pytest.mark.parametrize("header, use_cache", [
+        (None, True), ("false", True), ("0", True), ("true", False), ("1", False)
+    ])
+    @patch('deepgrep.web.app.semantic_engine')
+    def test_semantic_search_no_cache_header(self, mock_engine, client, header, use_cache):
+        """Test that X-DeepGrep-No-Cache is parsed as a boolean, not just checked for presence."""
+        mock_engine.find_semantic_matches.return_value = []
+        headers = {} if header is None else {'X-DeepGrep-No-Cache': header}
+        response = client.post('/semantic',
+                              data=json.dumps({"keyword": "happy", "text": "I am joyful"}),
+                              content_type='application/json',
+                              headers=headers)
+        
+        assert response.status_code == 200
+        assert mock_engine.find_semantic_matches.call_args.kwargs['use_cache'] is use_cache
+    
+    @patch('deepgrep.web.app.semantic_engine')
+    def test_semantic_search_invalid_no_cache_header(self, mock_engine, client):
+        """Test that a non-boolean X-DeepGrep-No-Cache returns 400 error."""
+        response = client.post('/semantic',
+                              data=json.dumps({"keyword": "happy", "text": "I am joyful"}),
+                              content_type='application/json',
+                              headers={'X-DeepGrep-No-Cache': 'maybe'})
+        
+        assert response.status_code == 400
+        mock_engine.find_semantic_matches.assert_not_called()
+    
+    @patch('deepgrep.web.app.semantic_engine')
+    def test_semantic_search_text_too_long(self, mock_engine, client, monkeypatch):
+        """Test that text longer than SpaCy will parse returns 413 without reaching the engine."""
+        monkeypatch.setattr('deepgrep.web.app.SEMANTIC_MAX_LENGTH', 10)
+        data = {
+            "keyword": "happy",
+            "text": "I am joyful and content."
+        }
+        response = client.post('/semantic',
+                              data=json.dumps(data),
+                              content_type='application/json')
+        
+        assert response.status_code == 413
+        assert 'error' in response.get_json()
+        mock_engine.find_semantic_matches.assert_not_called()
+    
     @patch('deepgrep.web.app.semantic_engine')
     def test_semantic_search_with_valid_keyword(self, mock_engine, client):
         """Test semantic search with a valid keyword."""
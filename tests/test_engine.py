@@ -1,4 +1,4 @@
-from deepgrep.core.engine import find_matches, match_pattern
+from deepgrep.core.engine import compile_prefilter, find_matches, find_matches_bulk, match_pattern
 
 def test_literal_match():
     assert match_pattern("hello", "hello") is True
@@ -15,4 +15,40 @@ def test_regex_word_char():
     line = "hello_world 42"
     pattern = r"\w+"
     matches = find_matches(line, pattern)
-    assert matches == ["hello_world", "42"]
\ No newline at end of file
+    assert matches == ["hello_world", "42"]
+
+def test_bulk_matches_each_line():
+    text = "abc 123\ndef 456\n\n789"
+    assert find_matches_bulk(text, r"\d+") == ["123", "456", "789"]
+    assert find_matches_bulk(text, r"^\w+") == ["abc", "def", "789"]
+
+def test_bounded_quantifier_is_not_exponential():
+    # {n,m} used to re-expand every earlier state, doubling work per extra repetition
+    assert find_matches("a" * 60, "a{0,50}") == ["a" * 50, "a" * 10]
+
+def test_literal_prefilter():
+    assert compile_prefilter("foo(bar)?|a[^b]*b+") == ("foo", "a")
+    assert compile_prefilter(r"\w+|foo") is None
+    assert compile_prefilter("x*y") is None
+    assert find_matches("xx foobar aqqbb fo ab", "foo(bar)?|a[^b]*b+") == ["foobar", "aqqbb", "ab"]
+
+def test_groups_without_backrefs_match_the_same():
+    assert find_matches("abab xab ba", "(a|ab)(b)?") == ["ab", "ab", "ab", "a"]
+    # Backreferences still see their captures
+    assert find_matches("abab abba", r"(ab)\1") == ["abab"]
+
+class CountingFind(str):
+    """A str that counts find() calls, to check how often the prefilter rescans a line."""
+    calls = 0
+
+    def find(self, *args):
+        CountingFind.calls += 1
+        return str.find(self, *args)
+
+def test_literal_prefilter_scans_each_prefix_once():
+    # "a" hits every few characters while "foo" never occurs; the absent prefix
+    # must not be searched for again after every "a" (quadratic on long lines)
+    line = CountingFind("a c " * 20000)
+    CountingFind.calls = 0
+    assert find_matches(line, "foo|a[0-9]") == []
+    assert CountingFind.calls <= line.count("a") + 2
@@ -0,0 +1,70 @@
+import sqlite3
+import pytest
+import deepgrep.core.history as history
+from deepgrep.core.history import SearchHistoryDB
+
+@pytest.fixture
+def db(tmp_path):
+    db = SearchHistoryDB(tmp_path / "history.db")
+    yield db
+    db.close()
+
+def test_list_all_respects_limit(db):
+    for i in range(5):
+        db.log_search(f"p{i}", i, ["web_input"])
+    rows = db.list_all(limit=2)
+    assert [r[0] for r in rows] == ["p4", "p3"]
+    assert len(db.list_all()) == 5
+
+def test_log_search_keeps_newest_records(db, monkeypatch):
+    monkeypatch.setattr(history, "MAX_HISTORY", 3)
+    for i in range(10):
+        db.log_search(f"p{i}", i, ["web_input"])
+    assert [r[0] for r in db.list_all()] == ["p9", "p8", "p7"]
+
+def test_log_searches_inserts_in_order(db):
+    assert db.log_searches([("a", 1, ["f1"]), ("b", 2, ["f2"])]) == 2
+    rows = db.list_all()
+    assert [(r[0], r[2]) for r in rows] == [("b", 2), ("a", 1)]
+
+def test_list_all_sees_new_searches_despite_cache(db):
+    db.log_search("a", 1, ["web_input"])
+    assert [r[0] for r in db.list_all(limit=50)] == ["a"]
+    db.log_search("b", 1, ["web_input"])
+    assert [r[0] for r in db.list_all(limit=50)] == ["b", "a"]
+
+def test_log_search_async_is_visible_before_and_after_flush(db):
+    db.log_search("a", 1, ["web_input"])
+    db.log_search_async("b", 2, ["web_input"])
+    assert [r[0] for r in db.list_all(limit=50)] == ["b", "a"]
+    db.flush()
+    assert [r[0] for r in db.list_all(limit=50)] == ["b", "a"]
+    assert [r[0] for r in db.get_recent()] == ["b", "a"]
+
+class FailingCommit:
+    """Wraps a connection so every transaction fails at commit time, like SQLITE_BUSY would."""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc):
+        self.conn.rollback()
+        raise sqlite3.OperationalError("database is locked")
+
+def test_failed_async_write_drops_only_its_batch(db):
+    db.log_search("a", 1, ["web_input"])
+    conn = db._conn
+    db._conn = FailingCommit(conn)
+    db.log_search_async("b", 2, ["web_input"])
+    db.flush()
+    db._conn = conn
+    assert db._pending == []
+    assert [r[0] for r in db.list_all()] == ["a"]
+    db.log_search_async("c", 3, ["web_input"])
+    db.flush()
+    assert [r[0] for r in db.list_all()] == ["c", "a"]
@@ -1,7 +1,12 @@
+import random
+import numpy as np
 import pytest
-from deepgrep.core.semantic_engine import SemanticEngine
+import spacy
+from spacy.language import Language
+import deepgrep.core.semantic_engine as semantic_engine
+from deepgrep.core.semantic_engine import ParsedText, SemanticEngine
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def engine():
     return SemanticEngine()
 
@@ -10,4 +15,134 @@ def test_semantic_similarity(engine):
     keyword = "happy"
     results = engine.find_semantic_matches(text, keyword)
     words = [w for w, _ in results]
-    assert "happy" in words or "joyful" in words
\ No newline at end of file
+    assert "happy" in words or "joyful" in words
+
+
+# --------------------------
+# Scoring on a blank pipeline with synthetic vectors (no model download needed)
+# --------------------------
+
+VECTORS = {
+    "happy": [1.0, 0.0, 0.0],
+    "joyful": [0.9, 0.1, 0.0],
+    "glad": [0.7, 0.7, 0.0],
+    "content": [0.5, 0.85, 0.0],
+    "sad": [1.0, 0.0, 0.05],
+    "run": [0.95, 0.0, 0.3],
+    "table": [0.0, 0.0, 1.0],
+}
+POS_TAGS = {"happy": "ADJ", "joyful": "ADJ", "glad": "ADJ", "content": "ADJ", "sad": "ADJ", "run": "VERB"}
+ANTONYMS = {"happy": frozenset({"sad"})}
+
+
+@Language.component("deepgrep_test_pos")
+def tag_pos(doc):
+    for token in doc:
+        token.pos_ = POS_TAGS.get(token.lower_, "NOUN")
+    return doc
+
+
+def blank_nlp(vectors):
+    nlp = spacy.blank("en")
+    for word, vector in vectors.items():
+        nlp.vocab.set_vector(word, np.asarray(vector, dtype=np.float32))
+    nlp.add_pipe("deepgrep_test_pos")
+    return nlp
+
+
+def make_engine(monkeypatch, vectors, antonyms=ANTONYMS):
+    nlp = blank_nlp(vectors)
+    monkeypatch.setattr(semantic_engine, "load_model", lambda name: nlp)
+    monkeypatch.setattr(semantic_engine, "get_antonyms", lambda word: antonyms.get(word, frozenset()))
+    return SemanticEngine()
+
+
+def baseline_matches(engine, text, keyword, top_n):
+    """The original token-by-token loop, kept as the reference the vectorized path must match."""
+    doc = engine.nlp(text)
+    key_token = engine.nlp(keyword)[0]
+    antonyms = semantic_engine.get_antonyms(keyword.lower())
+    results = []
+    for token in doc:
+        if not token.is_alpha or token.is_stop:
+            continue
+        if token.pos_ != key_token.pos_ and key_token.pos_ in {"ADJ", "VERB"}:
+            continue
+        if token.text.lower() in antonyms:
+            continue
+        results.append((token.text, key_token.similarity(token)))
+    results = sorted(results, key=lambda x: x[1], reverse=True)[:top_n]
+    return [(w, s) for w, s in results if s > semantic_engine.SEMANTIC_THRESHOLD]
+
+
+def assert_same_matches(actual, expected):
+    assert [w for w, _ in actual] == [w for w, _ in expected]
+    assert np.allclose([s for _, s in actual], [s for _, s in expected], atol=1e-6)
+
+
+@pytest.fixture
+def blank_engine(monkeypatch):
+    return make_engine(monkeypatch, VECTORS)
+
+
+def test_threshold_applies_before_top_n(blank_engine):
+    text = "the table and content glad joyful happy"
+    results = blank_engine.find_semantic_matches(text, "happy", top_n=10, use_cache=False)
+    # table (0.0) is below SEMANTIC_THRESHOLD, so fewer than top_n come back
+    assert [w for w, _ in results] == ["happy", "joyful", "glad", "content"]
+    assert_same_matches(results, baseline_matches(blank_engine, text, "happy", 10))
+
+
+def test_top_n_selects_highest_in_order(blank_engine):
+    text = "content glad joyful happy"
+    results = blank_engine.find_semantic_matches(text, "happy", top_n=2, use_cache=False)
+    assert [w for w, _ in results] == ["happy", "joyful"]
+    assert results[0][1] == 1.0
+
+
+def test_antonyms_and_pos_are_masked(blank_engine):
+    # sad is an antonym and run is a VERB; both are close to "happy" but must be skipped
+    results = blank_engine.find_semantic_matches("sad run joyful", "happy", use_cache=False)
+    assert [w for w, _ in results] == ["joyful"]
+    # A NOUN keyword doesn't filter by POS
+    nouns = blank_engine.find_semantic_matches("run table", "table", use_cache=False)
+    assert [w for w, _ in nouns] == ["table"]
+
+
+def test_repeated_words_score_every_occurrence(blank_engine):
+    text = "glad joyful glad happy joyful"
+    parsed = ParsedText.from_tokens(list(blank_engine.nlp(text)))
+    assert len(parsed) == 5 and len(parsed.words) == 3
+    results = blank_engine.find_semantic_matches(text, "happy", use_cache=False)
+    assert [w for w, _ in results] == ["happy", "joyful", "joyful", "glad", "glad"]
+    assert_same_matches(results, baseline_matches(blank_engine, text, "happy", 10))
+
+
+def test_no_candidates(blank_engine):
+    assert blank_engine.find_semantic_matches("the and of", "happy", use_cache=False) == []
+    assert blank_engine.find_semantic_matches_batch("the and of", ["happy", "table"]) == [[], []]
+
+
+def test_batch_matches_single_keyword_path(blank_engine):
+    text = "the table and content glad joyful happy sad run glad"
+    keywords = ["happy", "table", "glad", "run"]
+    batch = blank_engine.find_semantic_matches_batch(text, keywords, top_n=3)
+    for keyword, results in zip(keywords, batch):
+        assert_same_matches(results, blank_engine.find_semantic_matches(text, keyword, top_n=3, use_cache=False))
+
+
+def test_matches_baseline_loop_on_random_vectors(monkeypatch):
+    rng = np.random.default_rng(0)
+    words = [f"word{i}" for i in range(30)] + list(POS_TAGS)
+    vectors = {w: rng.standard_normal(8) for w in words}
+    vectors["word3"] = np.zeros(8)  # a word without a vector scores 0.0
+    engine = make_engine(monkeypatch, vectors, antonyms={"word1": frozenset({"word2", "word5"})})
+    picker = random.Random(0)
+    for _ in range(100):
+        text = " ".join(picker.choices(words + ["the", "and"], k=picker.randint(0, 40)))
+        keyword = picker.choice(words)
+        top_n = picker.choice([1, 3, 10, 50])
+        assert_same_matches(
+            engine.find_semantic_matches(text, keyword, top_n=top_n, use_cache=False),
+            baseline_matches(engine, text, keyword, top_n),
+        )
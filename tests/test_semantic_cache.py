@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from deepgrep.core.semantic_cache import SemanticCache
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+def test_exact_keyword_hit(rng):
+    cache = SemanticCache()
+    vec = rng.standard_normal(8, dtype=np.float32)
+    cache.put("doc", "happy", vec, [("joyful", 0.9)])
+    assert cache.get("doc", "happy", vec) == [("joyful", 0.9)]
+
+def test_near_duplicate_keyword_hit_and_namespace_isolation(rng):
+    cache = SemanticCache(threshold=0.95)
+    vec = rng.standard_normal(8, dtype=np.float32)
+    cache.put("doc", "happy", vec, [("joyful", 0.9)])
+    assert cache.get("doc", "Happy", vec * 2.0) == [("joyful", 0.9)]
+    assert cache.get("other-doc", "Happy", vec) is None
+    assert cache.get("doc", "table", rng.standard_normal(8, dtype=np.float32)) is None
+
+def test_ttl_and_lru_eviction(rng):
+    cache = SemanticCache(max_entries=2, ttl=0.0)
+    vec = rng.standard_normal(8, dtype=np.float32)
+    cache.put("doc", "a", vec, [])
+    assert cache.get("doc", "a", vec) is None
+
+    cache = SemanticCache(max_entries=2)
+    for kw in ("a", "b", "c"):
+        cache.put("doc", kw, rng.standard_normal(8, dtype=np.float32), [(kw, 1.0)])
+    assert len(cache) == 2
+    assert cache.get("doc", "a", np.zeros(8, dtype=np.float32)) is None